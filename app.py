@@ -1,12 +1,27 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, request
 import ccxt
+import hashlib
+import itertools
 import logging
+from collections import Counter, deque
+import numpy as np
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from datetime import datetime
 
+try:
+    from numba import njit
+except ImportError:  # Sem Numba, usa-se a versão vetorizada em NumPy do kernel
+    njit = None
+
 app = Flask(__name__)
 
 # Configuração de logging
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
 # Configurações iniciais
@@ -14,6 +29,15 @@ min_profit_margin = 0.002  # Margem mínima de lucro (0.2%)
 transaction_fee = 0.001    # Taxa de transação (0.1%)
 slippage = 0.0005          # Derrapagem (0.05%)
 fixed_investment = 100     # Valor fixo de compra por operação ($100)
+_BUY_MUL = 1 + transaction_fee + slippage   # Ajuste do preço de compra
+_SELL_MUL = 1 - transaction_fee - slippage  # Ajuste do preço de venda
+_MIN_ROI_PCT = min_profit_margin * 100      # ROI mínimo (%)
+fetch_timeout = 5          # Tempo máximo (s) de espera pelo lote de cotações
+MARKETS_TTL = 3600         # Validade (s) do cache de mercados por exchange
+TICKER_TTL = 3.0           # Validade (s) do cache de cotações por (exchange, par)
+SUPPORTED_PAIRS_REFRESH = 3600  # Intervalo (s) de atualização dos pares suportados
+HISTORY_MAXLEN = 1000      # Transações mantidas em memória
+HISTORY_RESPONSE_SIZE = 100  # Transações mais recentes enviadas pela API
 
 # Lista inicial de pares (mais utilizados em arbitragem)
 initial_pairs = [
@@ -22,134 +46,458 @@ initial_pairs = [
     "ENA/USDT", "AAVE/USDT", "LTC/USDT", "APT/USDT"
 ]
 
+def _http_session():
+    """Sessão HTTP persistente com pool grande o bastante para as consultas paralelas."""
+    session = requests.Session()
+    session.trust_env = False  # Mesmo padrão da sessão criada pelo ccxt
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 # Exchanges suportadas
 exchanges = {
-    "binance": ccxt.binance({'timeout': 10000}),
-    "kraken": ccxt.kraken({'timeout': 10000}),
-    "coinbase": ccxt.coinbase({'timeout': 10000}),
-    "kucoin": ccxt.kucoin({'timeout': 10000}),
-    "bitget": ccxt.bitget({'timeout': 10000}),
-    "bitfinex": ccxt.bitfinex({'timeout': 10000}),
+    "binance": ccxt.binance({'timeout': 10000, 'session': _http_session()}),
+    "kraken": ccxt.kraken({'timeout': 10000, 'session': _http_session()}),
+    "coinbase": ccxt.coinbase({'timeout': 10000, 'session': _http_session()}),
+    "kucoin": ccxt.kucoin({'timeout': 10000, 'session': _http_session()}),
+    "bitget": ccxt.bitget({'timeout': 10000, 'session': _http_session()}),
+    "bitfinex": ccxt.bitfinex({'timeout': 10000, 'session': _http_session()}),
 }
+EXCHANGE_NAMES = list(exchanges)  # Ordem das colunas nas matrizes de preços
+BINANCE_IDX = EXCHANGE_NAMES.index("binance")  # Coluna da exchange de venda
+OTHER_MASK = np.arange(len(EXCHANGE_NAMES)) != BINANCE_IDX  # Colunas das exchanges de compra
 
 # Variáveis globais
-transaction_history = []
+transaction_history = deque(maxlen=HISTORY_MAXLEN)
+_total_roi = 0.0  # Soma acumulada do ROI de todas as transações registradas
+_total_usd = 0.0  # Soma acumulada do valor das operações em USD
+_history_lock = threading.Lock()
 unsupported_pairs = set()  # Para armazenar pares não suportados
+_markets_cache = {}  # exchange -> (timestamp, mercados)
+
+def _markets(exchange_name, exchange):
+    """Retorna os mercados da exchange, recarregando-os apenas após MARKETS_TTL.
+
+    Se a recarga falhar, mantém os mercados já em cache, mesmo vencidos; sem
+    cache, o erro é propagado.
+    """
+    ts, markets = _markets_cache.get(exchange_name, (0, None))
+    if time.time() - ts > MARKETS_TTL:
+        try:
+            markets = exchange.load_markets(reload=True)  # Em caso de erro, `markets` mantém o cache
+        except Exception as e:
+            if markets is None:
+                raise
+            logger.warning("Erro ao recarregar mercados na %s, usando os anteriores: %s", exchange_name, e)
+            return markets
+        _markets_cache[exchange_name] = (time.time(), markets)
+    return markets
+
+def record_transaction(transaction):
+    """Registra a transação no histórico e atualiza os totais acumulados."""
+    global _total_roi, _total_usd
+    with _history_lock:
+        transaction_history.append(transaction)
+        _total_roi += transaction["roi"]
+        _total_usd += transaction["usd_operation_value"]
+
+_ticker_cache = {}  # (exchange, par) -> (timestamp, ticker)
+_ticker_locks = {}  # (exchange, par) -> Lock, evita consultas duplicadas simultâneas
+_ticker_locks_guard = threading.Lock()
+
+def _ticker_lock(key):
+    """Retorna o lock associado à chave do cache de cotações."""
+    with _ticker_locks_guard:
+        return _ticker_locks.setdefault(key, threading.Lock())
+
+def _cached_ticker(exchange_name, exchange, pair):
+    """Retorna a cotação do par, consultando a exchange no máximo uma vez por TICKER_TTL."""
+    key = (exchange_name, pair)
+    with _ticker_lock(key):
+        ts, ticker = _ticker_cache.get(key, (0, None))
+        if ticker is None or time.monotonic() - ts >= TICKER_TTL:
+            ticker = exchange.fetch_ticker(pair)
+            _ticker_cache[key] = (time.monotonic(), ticker)
+    return ticker
+
+def load_all_markets():
+    """Carrega os mercados de todas as exchanges em paralelo.
+
+    Retorna {exchange: mercados}; exchanges com erro ficam com None.
+    """
+    all_markets = {}
+    with ThreadPoolExecutor(max_workers=len(exchanges)) as executor:
+        futures = {executor.submit(_markets, exchange_name, exchange): exchange_name for exchange_name, exchange in exchanges.items()}
+        for future in as_completed(futures):
+            exchange_name = futures[future]
+            try:
+                all_markets[exchange_name] = future.result()
+            except Exception as e:
+                logger.error("Erro ao carregar mercados na %s: %s", exchange_name, e)
+                all_markets[exchange_name] = None
+    return all_markets
 
 def get_supported_pairs(pairs):
-    """Filtra apenas os pares suportados por pelo menos duas exchanges."""
+    """Filtra apenas os pares suportados por pelo menos duas exchanges.
+
+    Exchanges sem mercados disponíveis são ignoradas na contagem; nesse caso
+    nenhum par é marcado como não suportado, pois os dados estão incompletos.
+    Levanta RuntimeError se menos de duas exchanges tiverem mercados.
+    """
+    all_markets = load_all_markets()
+    available = [markets for markets in all_markets.values() if markets is not None]
+    if len(available) < 2:
+        raise RuntimeError(f"Mercados disponíveis em apenas {len(available)} exchange(s)")
+    complete = len(available) == len(all_markets)
+
+    candidates = {pair for pair in pairs if pair not in unsupported_pairs}  # Ignora pares já identificados como não suportados
+
+    # Conta, por par, quantas exchanges o listam: uma interseção de conjuntos por exchange
+    exchange_counts = Counter()
+    for markets in available:
+        exchange_counts.update(candidates.intersection(markets))
+
     supported_pairs = []
     for pair in pairs:
-        if pair in unsupported_pairs:  # Ignora pares já identificados como não suportados
+        if pair not in candidates:
             continue
-        supported_exchanges = []
-        for exchange_name, exchange in exchanges.items():
-            try:
-                markets = exchange.load_markets()
-                if pair in markets:
-                    supported_exchanges.append(exchange_name)
-            except Exception as e:
-                logger.error(f"Erro ao carregar mercados na {exchange_name}: {e}")
-        if len(supported_exchanges) >= 2:  # Requer pelo menos 2 exchanges suportando o par
-            logger.info(f"Par {pair} suportado pelas exchanges: {supported_exchanges}")
+        if exchange_counts[pair] >= 2:  # Requer pelo menos 2 exchanges suportando o par
+            logger.debug("Par %s suportado por %d exchanges", pair, exchange_counts[pair])
             supported_pairs.append(pair)
         else:
-            logger.warning(f"Par {pair} não suportado por pelo menos 2 exchanges.")
-            unsupported_pairs.add(pair)  # Adiciona o par à lista de não suportados
-    logger.info(f"Pares suportados: {supported_pairs}")  # Log dos pares suportados
+            logger.warning("Par %s não suportado por pelo menos 2 exchanges.", pair)
+            if complete:
+                unsupported_pairs.add(pair)  # Adiciona o par à lista de não suportados
+    logger.info("Pares suportados: %s", supported_pairs)  # Log dos pares suportados
     return supported_pairs
 
+def _cached_tickers(exchange_name, exchange, pairs):
+    """Retorna {par: cotação} da exchange, buscando os pares vencidos em uma única chamada fetch_tickers.
+
+    Pares não listados na exchange são ignorados, pois fetch_tickers rejeita o lote inteiro.
+    Usa os mercados já carregados pela atualização dos pares suportados; nunca
+    os recarrega no caminho da requisição.
+    """
+    markets = _markets_cache.get(exchange_name, (0, exchange.markets))[1]
+    if markets is None:
+        raise RuntimeError("mercados ainda não carregados")
+    listed = [pair for pair in pairs if pair in markets]
+    tickers = {}
+    with _ticker_lock((exchange_name, None)):
+        now = time.monotonic()
+        stale = []
+        for pair in listed:
+            ts, ticker = _ticker_cache.get((exchange_name, pair), (0, None))
+            if ticker is None or now - ts >= TICKER_TTL:
+                stale.append(pair)
+            else:
+                tickers[pair] = ticker
+        if stale:
+            fetched = exchange.fetch_tickers(stale)
+            now = time.monotonic()
+            for pair in stale:
+                if pair in fetched:
+                    _ticker_cache[(exchange_name, pair)] = (now, fetched[pair])
+                    tickers[pair] = fetched[pair]
+    return tickers
+
 def get_prices(pairs):
-    """Obtém preços das exchanges para os pares suportados."""
-    all_prices = {}
-    for pair in pairs:
-        prices = {}
-        for exchange_name, exchange in exchanges.items():
+    """Obtém preços das exchanges para os pares suportados.
+
+    Retorna duas matrizes float64 (pares x exchanges), `lasts` e `vols`, com
+    NaN onde não há cotação. As colunas seguem EXCHANGE_NAMES. Exchanges com
+    fetchTickers recebem uma única consulta para todos os pares; as demais,
+    uma por par. As consultas são disparadas em paralelo; uma exchange lenta
+    ou com erro não bloqueia as demais.
+    """
+    lasts = np.full((len(pairs), len(EXCHANGE_NAMES)), np.nan)
+    vols = np.full((len(pairs), len(EXCHANGE_NAMES)), np.nan)
+    if not len(pairs):
+        return lasts, vols
+
+    # (coluna, par); par None indica uma consulta em lote de todos os pares
+    jobs = []
+    for j, exchange_name in enumerate(EXCHANGE_NAMES):
+        if exchanges[exchange_name].has.get('fetchTickers'):
+            jobs.append((j, None))
+        else:
+            jobs.extend((j, pair) for pair in pairs)
+
+    pair_idx = {pair: i for i, pair in enumerate(pairs)}
+    executor = ThreadPoolExecutor(max_workers=len(jobs))
+    futures = {}
+    for j, pair in jobs:
+        exchange_name = EXCHANGE_NAMES[j]
+        if pair is None:
+            future = executor.submit(_cached_tickers, exchange_name, exchanges[exchange_name], pairs)
+        else:
+            future = executor.submit(_cached_ticker, exchange_name, exchanges[exchange_name], pair)
+        futures[future] = (j, pair)
+    try:
+        for future in as_completed(futures, timeout=fetch_timeout):
+            j, pair = futures[future]
+            exchange_name = EXCHANGE_NAMES[j]
             try:
-                ticker = exchange.fetch_ticker(pair)
-                prices[exchange_name] = {
-                    "last": ticker['last'],
-                    "volume": ticker['quoteVolume'],  # Volume 24h
-                }
-                logger.info(f"Preço obtido na {exchange_name}: {ticker['last']} para o par {pair}")
+                tickers = future.result() if pair is None else {pair: future.result()}
             except Exception as e:
-                logger.error(f"Erro ao obter preço na {exchange_name} para o par {pair}: {e}")
-                prices[exchange_name] = None
-        all_prices[pair] = prices
-    logger.info(f"Preços obtidos: {all_prices}")  # Log dos preços obtidos
-    return all_prices
-
-def calculate_arbitrage(prices):
-    """Calcula oportunidades de arbitragem."""
-    global transaction_history
-    results = []
-    for pair, pair_prices in prices.items():
-        valid_prices = {k: v for k, v in pair_prices.items() if v is not None and v['last'] is not None}
-        
-        # Verifica se há preços válidos tanto na Binance quanto em outras exchanges
-        binance_prices = valid_prices.get("binance")
-        other_exchanges_prices = {k: v for k, v in valid_prices.items() if k != "binance"}
-        
-        if not binance_prices or not other_exchanges_prices:
-            logger.warning(f"Par {pair} não suportado por Binance ou outras exchanges.")
+                logger.error("Erro ao obter preço na %s para o par %s: %s", exchange_name, pair or pairs, e)
+                continue
+            for ticker_pair, ticker in tickers.items():
+                i = pair_idx[ticker_pair]
+                if ticker['last'] is not None:
+                    lasts[i, j] = ticker['last']
+                if ticker['quoteVolume'] is not None:
+                    vols[i, j] = ticker['quoteVolume']  # Volume 24h
+                logger.debug("Preço obtido na %s: %s para o par %s", exchange_name, ticker['last'], ticker_pair)
+    except FuturesTimeoutError:
+        pending = [(EXCHANGE_NAMES[j], pair or "*") for f, (j, pair) in futures.items() if not f.done()]
+        logger.error("Tempo esgotado ao obter preços: %s", pending)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return lasts, vols
+
+def _arb_kernel_numpy(lasts, binance_idx, buy_mul, sell_mul, min_roi_pct):
+    """Kernel de arbitragem vetorizado em NumPy (mesma interface de _arb_kernel)."""
+    n_pairs, n_exchanges = lasts.shape
+    other_mask = OTHER_MASK if binance_idx == BINANCE_IDX else np.arange(n_exchanges) != binance_idx
+    sell_prices = lasts[:, binance_idx]
+    others = lasts[:, other_mask]
+    missing = np.isnan(lasts)
+    others_missing = missing[:, other_mask]
+
+    # A máscara de NaN faz o filtro de cotações válidas sem dicionários intermediários
+    valid = ~missing[:, binance_idx] & ~others_missing.all(axis=1)
+    best = np.argmin(np.where(others_missing, np.inf, others), axis=1)
+    buy_idx = np.flatnonzero(other_mask)[best]
+    buy_prices = others[np.arange(n_pairs), best]
+
+    adjusted_buy = buy_prices * buy_mul
+    adjusted_sell = sell_prices * sell_mul
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = np.where(adjusted_buy > 0, (adjusted_sell - adjusted_buy) / adjusted_buy * 100, 0.0)
+        counts = np.sum(~missing, axis=1)
+        avg_prices = np.nansum(lasts, axis=1) / np.maximum(counts, 1)
+        spreads = np.where(avg_prices > 0, (sell_prices - buy_prices) / avg_prices * 100, 0.0)
+    mask = valid & (roi >= min_roi_pct)
+    return buy_idx, roi, spreads, avg_prices, valid, mask
+
+def _arb_kernel_loop(lasts, binance_idx, buy_mul, sell_mul, min_roi_pct):
+    """Kernel de arbitragem em laços simples, compilado pelo Numba.
+
+    Retorna, por par: coluna da exchange de compra, ROI (%), spread (%),
+    preço médio, se o par tem preços válidos e se passa na margem mínima.
+    """
+    n_pairs, n_exchanges = lasts.shape
+    buy_idx = np.zeros(n_pairs, dtype=np.int64)
+    roi = np.zeros(n_pairs)
+    spreads = np.zeros(n_pairs)
+    avg_prices = np.zeros(n_pairs)
+    valid = np.zeros(n_pairs, dtype=np.bool_)
+    mask = np.zeros(n_pairs, dtype=np.bool_)
+    for i in range(n_pairs):
+        sell_price = lasts[i, binance_idx]
+        # Uma única passada acumula a soma (preço médio) e o menor preço de compra
+        best = -1
+        best_price = np.inf
+        total = 0.0
+        count = 0
+        for j in range(n_exchanges):
+            price = lasts[i, j]
+            if np.isnan(price):
+                continue
+            total += price
+            count += 1
+            if j != binance_idx and price < best_price:
+                best = j
+                best_price = price
+        if np.isnan(sell_price) or best < 0:
             continue
-        
-        # Define a Binance como exchange de venda
-        sell_exchange = "binance"
-        sell_price = binance_prices['last']
-        
-        # Encontra a melhor exchange para compra (menor preço)
-        buy_exchange = min(other_exchanges_prices, key=lambda x: other_exchanges_prices[x]['last'])
-        buy_price = other_exchanges_prices[buy_exchange]['last']
-        
-        # Aplica taxa de transação e derrapagem
-        adjusted_buy_price = buy_price * (1 + transaction_fee + slippage)
-        adjusted_sell_price = sell_price * (1 - transaction_fee - slippage)
-        
-        # Calcula o ROI ajustado
-        roi = ((adjusted_sell_price - adjusted_buy_price) / adjusted_buy_price) * 100 if adjusted_buy_price > 0 else 0
-        
-        # Calcula o spread médio
-        avg_price = sum(p['last'] for p in valid_prices.values()) / len(valid_prices)
-        spread = (sell_price - buy_price) / avg_price * 100 if avg_price > 0 else 0
-        
-        logger.info(f"Par: {pair}, Compra: {buy_exchange} (${buy_price}), Venda: {sell_exchange} (${sell_price}), ROI: {roi:.2f}%, Spread: {spread:.2f}%")
-        
-        # Filtra apenas oportunidades com ROI acima da margem mínima
-        if roi >= min_profit_margin * 100:
-            # Calcula o valor total da operação
-            usd_operation_value = fixed_investment * (1 + roi / 100)
-            
-            results.append({
-                "pair": pair,
-                "buy_exchange": buy_exchange,
-                "buy_price": buy_price,
-                "sell_exchange": sell_exchange,
-                "sell_price": sell_price,
-                "roi": roi,
-                "spread": spread,
-                "avg_price": avg_price,
-                "usd_operation_value": usd_operation_value,  # Valor total da operação em USD
-            })
-            
-            # Registra a transação
-            transaction = {
-                "pair": pair,
-                "buy_exchange": buy_exchange,
-                "buy_price": buy_price,
-                "sell_exchange": sell_exchange,
-                "sell_price": sell_price,
-                "roi": roi,
-                "spread": spread,
-                "avg_price": avg_price,
-                "usd_operation_value": usd_operation_value,  # Valor total da operação em USD
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            }
-            transaction_history.append(transaction)
-    
-    logger.info(f"Resultados de arbitragem: {results}")  # Log dos resultados
+        buy_price = best_price
+        adjusted_buy = buy_price * buy_mul
+        adjusted_sell = sell_price * sell_mul
+        buy_idx[i] = best
+        valid[i] = True
+        roi[i] = (adjusted_sell - adjusted_buy) / adjusted_buy * 100 if adjusted_buy > 0 else 0.0
+        avg_prices[i] = total / count
+        spreads[i] = (sell_price - buy_price) / avg_prices[i] * 100 if avg_prices[i] > 0 else 0.0
+        mask[i] = roi[i] >= min_roi_pct
+    return buy_idx, roi, spreads, avg_prices, valid, mask
+
+# fastmath sem 'nnan'/'ninf': os kernels dependem de NaN para marcar cotações ausentes
+_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+if njit is not None:
+    _arb_kernel = njit(cache=True, fastmath=_FASTMATH)(_arb_kernel_loop)
+else:
+    _arb_kernel = _arb_kernel_numpy
+
+def _build_specialized_kernel(pairs):
+    """Gera uma versão de _arb_kernel_loop desenrolada para a lista de pares dada.
+
+    Índices de pares e exchanges, a coluna da Binance e as constantes de taxa
+    ficam fixos no código gerado. A função recebe apenas `lasts` e é compilada
+    pelo Numba quando disponível.
+    """
+    n_pairs = len(pairs)
+    lines = [
+        "def _calc(lasts):",
+        f"    buy_idx = np.zeros({n_pairs}, dtype=np.int64)",
+        f"    roi = np.zeros({n_pairs})",
+        f"    spreads = np.zeros({n_pairs})",
+        f"    avg_prices = np.zeros({n_pairs})",
+        f"    valid = np.zeros({n_pairs}, dtype=np.bool_)",
+        f"    mask = np.zeros({n_pairs}, dtype=np.bool_)",
+    ]
+    for i, pair in enumerate(pairs):
+        lines += [
+            f"    # {pair}",
+            "    best = -1",
+            "    best_price = np.inf",
+            "    total = 0.0",
+            "    count = 0",
+        ]
+        for j in range(len(EXCHANGE_NAMES)):
+            lines += [
+                f"    price = lasts[{i}, {j}]",
+                "    if not np.isnan(price):",
+                "        total += price",
+                "        count += 1",
+            ]
+            if j != BINANCE_IDX:
+                lines += [
+                    "        if price < best_price:",
+                    f"            best = {j}",
+                    "            best_price = price",
+                ]
+        lines += [
+            f"    sell_price = lasts[{i}, {BINANCE_IDX}]",
+            "    if not np.isnan(sell_price) and best >= 0:",
+            f"        adjusted_buy = best_price * {_BUY_MUL!r}",
+            f"        adjusted_sell = sell_price * {_SELL_MUL!r}",
+            f"        buy_idx[{i}] = best",
+            f"        valid[{i}] = True",
+            f"        roi[{i}] = (adjusted_sell - adjusted_buy) / adjusted_buy * 100 if adjusted_buy > 0 else 0.0",
+            f"        avg_prices[{i}] = total / count",
+            f"        spreads[{i}] = (sell_price - best_price) / avg_prices[{i}] * 100 if avg_prices[{i}] > 0 else 0.0",
+            f"        mask[{i}] = roi[{i}] >= {_MIN_ROI_PCT!r}",
+        ]
+    lines.append("    return buy_idx, roi, spreads, avg_prices, valid, mask")
+
+    namespace = {"np": np}
+    exec(compile("\n".join(lines), "<arb_kernel>", "exec"), namespace)
+    calc = namespace["_calc"]
+    if njit is not None:
+        calc = njit(fastmath=_FASTMATH)(calc)
+        calc(np.full((n_pairs, len(EXCHANGE_NAMES)), np.nan))  # Compila antes de ser publicado
+    return calc
+
+_specialized_kernel = None  # (pares, kernel gerado) para o conjunto atual de pares suportados
+
+def _update_specialized_kernel(pairs):
+    """Gera e publica o kernel especializado para os pares, se ainda não existir.
+
+    Só é usado com Numba: em Python puro o código desenrolado é mais lento que
+    o kernel vetorizado em NumPy.
+    """
+    global _specialized_kernel
+    if njit is None:
+        return
+    if _specialized_kernel is not None and _specialized_kernel[0] == tuple(pairs):
+        return
+    try:
+        _specialized_kernel = (tuple(pairs), _build_specialized_kernel(pairs))
+    except Exception as e:
+        logger.error("Erro ao gerar kernel especializado: %s", e)
+
+def calculate_arbitrage(pairs, lasts):
+    """Calcula oportunidades de arbitragem a partir da matriz de preços (pares x exchanges)."""
+    results = []
+    if not len(pairs):
+        return results
+
+    # Define a Binance como exchange de venda; a compra é feita na de menor preço
+    sell_exchange = "binance"
+    specialized = _specialized_kernel
+    if specialized is not None and specialized[0] == tuple(pairs):
+        buy_idx, roi, spreads, avg_prices, valid, mask = specialized[1](lasts)
+    else:
+        buy_idx, roi, spreads, avg_prices, valid, mask = _arb_kernel(
+            lasts, BINANCE_IDX, _BUY_MUL, _SELL_MUL, _MIN_ROI_PCT
+        )
+
+    for i in np.flatnonzero(~valid):
+        logger.warning("Par %s não suportado por Binance ou outras exchanges.", pairs[i])
+    if logger.isEnabledFor(logging.DEBUG):
+        for i in np.flatnonzero(valid):
+            logger.debug(
+                "Par: %s, Compra: %s ($%s), Venda: %s ($%s), ROI: %.2f%%, Spread: %.2f%%",
+                pairs[i], EXCHANGE_NAMES[buy_idx[i]], lasts[i, buy_idx[i]], sell_exchange, lasts[i, BINANCE_IDX], roi[i], spreads[i],
+            )
+
+    # Apenas oportunidades com ROI acima da margem mínima
+    for i in np.flatnonzero(mask):
+        pair_roi = float(roi[i])
+        # Calcula o valor total da operação
+        usd_operation_value = fixed_investment * (1 + pair_roi / 100)
+
+        opportunity = {
+            "pair": pairs[i],
+            "buy_exchange": EXCHANGE_NAMES[buy_idx[i]],
+            "buy_price": float(lasts[i, buy_idx[i]]),
+            "sell_exchange": sell_exchange,
+            "sell_price": float(lasts[i, BINANCE_IDX]),
+            "roi": pair_roi,
+            "spread": float(spreads[i]),
+            "avg_price": float(avg_prices[i]),
+            "usd_operation_value": usd_operation_value,  # Valor total da operação em USD
+        }
+        results.append(opportunity)
+
+        # Registra a transação
+        record_transaction({
+            **opportunity,
+            "timestamp": time.time(),  # Formatado apenas ao ser enviado pela API
+        })
+
     return results
 
+SUPPORTED_PAIRS = None  # Calculado na primeira requisição e atualizado em segundo plano
+_supported_pairs_lock = threading.Lock()
+
+def _refresh_supported_pairs_loop():
+    """Atualiza SUPPORTED_PAIRS periodicamente, mantendo o valor anterior em caso de erro.
+
+    O kernel especializado também é gerado aqui, fora do caminho das requisições;
+    até ele ficar pronto, calculate_arbitrage usa _arb_kernel.
+    """
+    global SUPPORTED_PAIRS
+    while True:
+        _update_specialized_kernel(SUPPORTED_PAIRS)
+        time.sleep(SUPPORTED_PAIRS_REFRESH)
+        try:
+            pairs = get_supported_pairs(initial_pairs)
+            with _supported_pairs_lock:
+                SUPPORTED_PAIRS = pairs
+        except Exception as e:
+            logger.error("Erro ao atualizar pares suportados: %s", e)
+
+def current_supported_pairs():
+    """Retorna os pares suportados, calculando-os e iniciando a atualização na primeira chamada.
+
+    Se o primeiro cálculo falhar, retorna uma lista vazia e tenta de novo na próxima chamada.
+    """
+    global SUPPORTED_PAIRS
+    with _supported_pairs_lock:
+        if SUPPORTED_PAIRS is None:
+            try:
+                SUPPORTED_PAIRS = get_supported_pairs(initial_pairs)
+            except Exception as e:
+                logger.error("Erro ao obter pares suportados: %s", e)
+                return []
+            threading.Thread(target=_refresh_supported_pairs_loop, daemon=True).start()
+        return SUPPORTED_PAIRS
+
 @app.route('/')
 def index():
     """Rota principal que renderiza o dashboard."""
@@ -158,9 +506,9 @@ def index():
 @app.route('/api/get_data')
 def get_data_api():
     """API para fornecer os dados em tempo real."""
-    pairs = get_supported_pairs(initial_pairs)
-    prices = get_prices(pairs)
-    results = calculate_arbitrage(prices)
+    pairs = current_supported_pairs()
+    lasts, _ = get_prices(pairs)
+    results = calculate_arbitrage(pairs, lasts)
     
     # Simulação de dados (caso não haja resultados reais)
     if not results:
@@ -179,20 +527,31 @@ def get_data_api():
             }
         ]
     
-    # Calcula o desempenho geral com base no histórico de transações
-    total_roi = sum(tx["roi"] for tx in transaction_history) if transaction_history else 0
-    total_usd_operations = sum(tx["usd_operation_value"] for tx in transaction_history) if transaction_history else 0
-    
-    performance = {
-        "total_roi": total_roi,
-        "total_usd_operations": total_usd_operations,  # Total de operações em USD
-    }
-    logger.info(f"Dados enviados pela API: results={results}, performance={performance}")
-    return jsonify({
+    # Desempenho geral a partir dos totais acumulados do histórico de transações
+    with _history_lock:
+        performance = {
+            "total_roi": _total_roi,
+            "total_usd_operations": _total_usd,  # Total de operações em USD
+        }
+        start = max(0, len(transaction_history) - HISTORY_RESPONSE_SIZE)
+        recent_history = list(itertools.islice(transaction_history, start, None))
+    recent_history = [
+        {**tx, "timestamp": datetime.fromtimestamp(tx["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")}
+        for tx in recent_history
+    ]
+    payload = {
         "results": results,
         "performance": performance,
-        "transaction_history": transaction_history,
-    })
+        "transaction_history": recent_history,
+    }
+    body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    # ETag permite que o dashboard receba 304 enquanto os dados não mudarem
+    response = app.response_class(body, mimetype="application/json")
+    response.set_etag(hashlib.blake2b(body, digest_size=8).hexdigest())
+    response.headers["Cache-Control"] = "no-cache"  # Sempre revalidar com o ETag
+    return response.make_conditional(request)
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    # Servidor de desenvolvimento; em produção use: gunicorn app:app (ver gunicorn.conf.py)
+    app.run(debug=False)
\ No newline at end of file
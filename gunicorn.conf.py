@@ -0,0 +1,15 @@
+# Configuração do gunicorn para produção: gunicorn app:app
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+
+# Workers gevent tornam cooperativas as chamadas bloqueantes do ccxt (requests),
+# permitindo atender muitas requisições simultâneas por processo.
+worker_class = "gevent"
+worker_connections = 200
+
+# O histórico de transações e os caches ficam em memória por processo; com mais
+# de um worker cada um mantém o seu próprio histórico.
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+
+timeout = 30
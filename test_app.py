@@ -0,0 +1,192 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+import app
+
+
+def reference_arbitrage(row):
+    """Cálculo original (por par, com dicionários) usado como referência para os kernels."""
+    valid_prices = {app.EXCHANGE_NAMES[j]: float(p) for j, p in enumerate(row) if not np.isnan(p)}
+    sell_price = valid_prices.get("binance")
+    others = {k: v for k, v in valid_prices.items() if k != "binance"}
+    if sell_price is None or not others:
+        return None
+    buy_exchange = min(others, key=others.get)
+    buy_price = others[buy_exchange]
+    adjusted_buy = buy_price * (1 + app.transaction_fee + app.slippage)
+    adjusted_sell = sell_price * (1 - app.transaction_fee - app.slippage)
+    roi = ((adjusted_sell - adjusted_buy) / adjusted_buy) * 100 if adjusted_buy > 0 else 0
+    avg_price = sum(valid_prices.values()) / len(valid_prices)
+    spread = (sell_price - buy_price) / avg_price * 100 if avg_price > 0 else 0
+    return app.EXCHANGE_NAMES.index(buy_exchange), roi, spread, avg_price
+
+
+def random_prices(rng, n_pairs=12):
+    lasts = rng.uniform(1, 100, (n_pairs, len(app.EXCHANGE_NAMES)))
+    lasts[rng.random(lasts.shape) < 0.3] = np.nan
+    return lasts
+
+
+def generic_kernel(lasts):
+    return app._arb_kernel(lasts, app.BINANCE_IDX, app._BUY_MUL, app._SELL_MUL, app._MIN_ROI_PCT)
+
+
+def numpy_kernel(lasts):
+    return app._arb_kernel_numpy(lasts, app.BINANCE_IDX, app._BUY_MUL, app._SELL_MUL, app._MIN_ROI_PCT)
+
+
+specialized_kernel = app._build_specialized_kernel(app.initial_pairs)
+
+
+@pytest.mark.parametrize("kernel", [generic_kernel, numpy_kernel, specialized_kernel])
+def test_kernel_matches_reference(kernel):
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        lasts = random_prices(rng)
+        buy_idx, roi, spreads, avg_prices, valid, mask = kernel(lasts)
+        for i, row in enumerate(lasts):
+            expected = reference_arbitrage(row)
+            assert valid[i] == (expected is not None)
+            if expected is None:
+                assert not mask[i]
+                continue
+            exp_buy_idx, exp_roi, exp_spread, exp_avg = expected
+            assert buy_idx[i] == exp_buy_idx
+            assert roi[i] == pytest.approx(exp_roi, rel=1e-9, abs=1e-12)
+            assert spreads[i] == pytest.approx(exp_spread, rel=1e-9, abs=1e-12)
+            assert avg_prices[i] == pytest.approx(exp_avg, rel=1e-12)
+            assert mask[i] == (exp_roi >= app.min_profit_margin * 100)
+
+
+def test_specialized_kernel_requires_numba(monkeypatch):
+    monkeypatch.setattr(app, "njit", None)
+    monkeypatch.setattr(app, "_specialized_kernel", None)
+    app._update_specialized_kernel(app.initial_pairs)
+    assert app._specialized_kernel is None
+
+
+def test_calculate_arbitrage_reports_quoted_prices():
+    lasts = np.full((1, len(app.EXCHANGE_NAMES)), np.nan)
+    lasts[0, app.BINANCE_IDX] = 3030.123
+    lasts[0, app.EXCHANGE_NAMES.index("kraken")] = 3000.07
+    lasts[0, app.EXCHANGE_NAMES.index("coinbase")] = 3010.41
+
+    [result] = app.calculate_arbitrage(["ETH/USDT"], lasts)
+
+    assert result["buy_exchange"] == "kraken"
+    assert result["buy_price"] == 3000.07
+    assert result["sell_price"] == 3030.123
+    assert result["avg_price"] == pytest.approx((3030.123 + 3000.07 + 3010.41) / 3, rel=1e-15)
+    assert result["spread"] == pytest.approx(
+        (result["sell_price"] - result["buy_price"]) / result["avg_price"] * 100, rel=1e-12
+    )
+
+
+def set_markets(monkeypatch, markets_by_exchange):
+    """Substitui load_markets de cada exchange; None simula a exchange fora do ar."""
+    def loader(markets):
+        def load_markets(reload=False):
+            if markets is None:
+                raise ConnectionError("exchange fora do ar")
+            return {pair: {} for pair in markets}
+        return load_markets
+    for exchange_name, exchange in app.exchanges.items():
+        monkeypatch.setattr(exchange, "load_markets", loader(markets_by_exchange.get(exchange_name, [])))
+
+
+def test_supported_pairs_keep_stale_markets_when_reload_fails(monkeypatch):
+    monkeypatch.setattr(app, "_markets_cache", {})
+    monkeypatch.setattr(app, "unsupported_pairs", set())
+    set_markets(monkeypatch, {name: ["ETH/USDT", "XRP/USDT"] for name in app.exchanges})
+    assert app.get_supported_pairs(["ETH/USDT", "XRP/USDT"]) == ["ETH/USDT", "XRP/USDT"]
+
+    # Cache vencido e todas as exchanges fora do ar: os mercados anteriores continuam valendo
+    monkeypatch.setattr(app, "MARKETS_TTL", -1)
+    set_markets(monkeypatch, {name: None for name in app.exchanges})
+    assert app.get_supported_pairs(["ETH/USDT", "XRP/USDT"]) == ["ETH/USDT", "XRP/USDT"]
+    assert not app.unsupported_pairs
+
+
+def test_supported_pairs_ignore_exchange_without_markets(monkeypatch):
+    monkeypatch.setattr(app, "_markets_cache", {})
+    monkeypatch.setattr(app, "unsupported_pairs", set())
+    markets = {name: ["ETH/USDT", "XRP/USDT"] for name in app.exchanges}
+    markets["kraken"] = ["ETH/USDT", "XRP/USDT", "ADA/USDT"]
+    markets["bitfinex"] = None
+    set_markets(monkeypatch, markets)
+
+    assert app.get_supported_pairs(["ETH/USDT", "XRP/USDT", "ADA/USDT"]) == ["ETH/USDT", "XRP/USDT"]
+    # Com uma exchange fora do ar, ADA/USDT não é descartado em definitivo
+    assert not app.unsupported_pairs
+
+
+def test_supported_pairs_raise_without_markets(monkeypatch):
+    monkeypatch.setattr(app, "_markets_cache", {})
+    monkeypatch.setattr(app, "unsupported_pairs", set())
+    set_markets(monkeypatch, {name: None for name in app.exchanges})
+    with pytest.raises(RuntimeError):
+        app.get_supported_pairs(["ETH/USDT"])
+    assert not app.unsupported_pairs
+
+
+def test_batched_tickers_never_reload_markets(monkeypatch):
+    exchange = app.exchanges["binance"]
+    monkeypatch.setattr(app, "_markets_cache", {"binance": (0, {"ETH/USDT": {}})})  # Cache vencido
+    monkeypatch.setattr(app, "_ticker_cache", {})
+    monkeypatch.setattr(exchange, "load_markets", lambda reload=False: pytest.fail("load_markets chamado"))
+    requested = []
+
+    def fetch_tickers(symbols=None):
+        requested.append(list(symbols))
+        return {pair: {"last": 1.0, "quoteVolume": 2.0} for pair in symbols}
+
+    monkeypatch.setattr(exchange, "fetch_tickers", fetch_tickers)
+    tickers = app._cached_tickers("binance", exchange, ["ETH/USDT", "TON/USDT"])
+    assert list(tickers) == ["ETH/USDT"]
+    assert requested == [["ETH/USDT"]]
+
+
+def test_totals_count_transactions_evicted_from_history(monkeypatch):
+    monkeypatch.setattr(app, "transaction_history", deque(maxlen=3))
+    monkeypatch.setattr(app, "_total_roi", 0.0)
+    monkeypatch.setattr(app, "_total_usd", 0.0)
+    for roi in range(1, 6):
+        app.record_transaction({"roi": float(roi), "usd_operation_value": 100.0 + roi, "timestamp": 0.0})
+
+    assert [tx["roi"] for tx in app.transaction_history] == [3.0, 4.0, 5.0]
+    assert app._total_roi == 15.0
+    assert app._total_usd == 515.0
+
+
+def test_get_data_etag(monkeypatch):
+    monkeypatch.setattr(app, "current_supported_pairs", lambda: [])
+    monkeypatch.setattr(app, "transaction_history", deque(maxlen=app.HISTORY_MAXLEN))
+    monkeypatch.setattr(app, "_total_roi", 0.0)
+    monkeypatch.setattr(app, "_total_usd", 0.0)
+    client = app.app.test_client()
+
+    response = client.get("/api/get_data")
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+
+    response = client.get("/api/get_data", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    # Uma nova oportunidade registrada muda o conteúdo e, portanto, o ETag
+    app.record_transaction({"roi": 0.5, "usd_operation_value": 100.5, "timestamp": 0.0})
+    response = client.get("/api/get_data", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_kernel_handles_missing_columns():
+    lasts = np.full((3, len(app.EXCHANGE_NAMES)), np.nan)
+    lasts[0, app.BINANCE_IDX] = 10.0  # Apenas a Binance
+    lasts[1, 1 if app.BINANCE_IDX != 1 else 2] = 10.0  # Sem a Binance
+    for kernel in (generic_kernel, numpy_kernel):
+        valid, mask = kernel(lasts)[4:]
+        assert not valid.any()
+        assert not mask.any()